@@ -2,7 +2,17 @@ from __future__ import annotations
 
 import argparse
 import cv2
+import numpy as np
 import os
+import queue
+import threading
+from collections import defaultdict
+from contextlib import closing
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+
+from threadpoolctl import threadpool_limits
 
 from config import (
     DEFAULT_BRIGHTFIELD_SUFFIX,
@@ -11,11 +21,15 @@ from config import (
 )
 from seeds import process_seed_image, process_colorimetric_image
 from utils import (
-    VALID_EXTENSIONS,
+    IO_MODES,
+    VALID_EXTENSIONS_TUPLE,
     CountMethod,
     Result,
+    get_turbo_jpeg,
     parse_filename,
+    prefetch_iter,
     store_results,
+    store_results_append,
 )
 
 DEFAULT_BRIGHTFIELD_THESHOLD = INITIAL_BRIGHTNESS_THRESHOLDS[DEFAULT_BRIGHTFIELD_SUFFIX]
@@ -23,10 +37,132 @@ DEFAULT_FLUORESCENT_THRESHOLD = INITIAL_BRIGHTNESS_THRESHOLDS[
     DEFAULT_FLUORESCENT_SUFFIX
 ]
 
-from typing import Dict, Iterator, List, Tuple
+from typing import Any, Callable, Dict, Iterator, List, Tuple
 
 
-def process_fluorescent_batch(
+@dataclass
+class FluorescentBatchParams:
+    """Parameters shared by every sample of a fluorescent batch."""
+
+    bf_thresh: int | None
+    fl_thresh: int | None
+    radial_thresh: float | None
+    batch_output_dir: str | None
+    bf_suffix: str
+    fl_suffix: str
+    radial_threshold_ratio: float | None = None
+    large_area_factor: float | None = None
+    plot: bool = False
+    io_mode: str = "imread"
+    fast_jpeg: bool = False
+
+
+def _init_worker() -> None:
+    """Limit OpenCV and BLAS/OpenMP to one thread in process pool workers.
+
+    Workers may be forked from a process whose native thread pools are already
+    initialized, so the limits are applied at runtime rather than through
+    environment variables.
+    """
+    cv2.setNumThreads(1)
+    threadpool_limits(limits=1)
+
+
+def _process_one_sample(
+    sample_name: str,
+    files: List[Dict[str, str]],
+    params: FluorescentBatchParams,
+    prefetcher: Iterator[Tuple[Dict[str, str], np.ndarray | None]] | None = None,
+) -> Tuple[Result, List[str]]:
+    """Process the brightfield/fluorescent pair of a single sample.
+
+    Defined at module level so it can be dispatched to worker processes.
+    Images are taken from ``prefetcher`` (see :func:`utils.prefetch_iter`),
+    one per entry in ``files``; a prefetcher over ``files`` is created when
+    none is given. Returns the sample :class:`Result` and the status messages
+    produced while processing it.
+    """
+    if prefetcher is None:
+        with closing(
+            prefetch_iter(
+                files, io_mode=params.io_mode, fast_jpeg=params.fast_jpeg
+            )
+        ) as own_prefetcher:
+            return _process_one_sample(sample_name, files, params, own_prefetcher)
+
+    _BF = DEFAULT_BRIGHTFIELD_SUFFIX
+    _FL = DEFAULT_FLUORESCENT_SUFFIX
+    bf_suffix = params.bf_suffix
+    fl_suffix = params.fl_suffix
+    # Per image type: name expected by process_seed_image, initial threshold
+    # and the Result fields the outcome is stored in
+    type_config = {
+        bf_suffix: dict(
+            name=_BF,
+            thresh=params.bf_thresh,
+            count_attr="total_seeds",
+            thresh_attr="bf_thresh",
+            label="brightfield",
+        ),
+        fl_suffix: dict(
+            name=_FL,
+            thresh=params.fl_thresh,
+            count_attr="marker_seeds",
+            thresh_attr="marker_thresh",
+            label="fluorescent",
+        ),
+    }
+
+    messages = []
+    unreadable = set()
+    result = Result(sample_name)
+    result.radial_threshold_ratio = params.radial_threshold_ratio
+    for _ in range(len(files)):
+        file_obj, image = next(prefetcher)
+        filename = file_obj["file_name"]
+        img_type = file_obj["img_type"]
+
+        cfg = type_config.get(img_type)
+        if cfg is None:
+            messages.append(f"\tUnknown image type for {filename}")
+            continue
+
+        if image is None:
+            messages.append(f"\tFailed to read {filename}, skipping it")
+            unreadable.add(img_type)
+            continue
+        # Guard against views (e.g. channel swaps) reaching code that expects
+        # C-contiguous buffers; no copy is made if the array already is
+        image = np.ascontiguousarray(image)
+
+        messages.append(f"\t{img_type} ({cfg['label']}) image: {filename}")
+        process_seed_result = process_seed_image(
+            image=image,
+            img_type=cfg["name"],
+            sample_name=sample_name,
+            initial_brightness_thresh=cfg["thresh"],
+            radial_threshold=params.radial_thresh,
+            radial_threshold_ratio=params.radial_threshold_ratio,
+            image_L=None,
+            large_area_factor=params.large_area_factor,
+            output_dir=params.batch_output_dir,
+            plot=params.plot,
+        )
+        setattr(result, cfg["count_attr"], process_seed_result.num_seeds)
+        setattr(result, cfg["thresh_attr"], process_seed_result.brightness_threshold)
+        result.radial_threshold = process_seed_result.radial_threshold
+
+    # The naming hint is only relevant when the image is missing, not when it
+    # was found but could not be decoded
+    if not result.total_seeds and bf_suffix not in unreadable:
+        messages.append(f"\tCouldn't find {bf_suffix} (brightfield) image for {sample_name}. Remember that image should be named <prefix_id>_{bf_suffix}.<img_extension>. Example: img1_{bf_suffix}.tif")
+    if not result.marker_seeds and fl_suffix not in unreadable:
+        messages.append(f"\tCouldn't find {fl_suffix} (fluorescent) image for {sample_name}. Remember that image should be named <prefix_id>_{fl_suffix}.<img_extension>. Example: img1_{fl_suffix}.tif")
+
+    return result, messages
+
+
+def run_fluorescent_batch(
     sample_to_files: Dict[str, List[Dict[str, str]]],
     bf_thresh: int | None,
     fl_thresh: int | None,
@@ -37,7 +173,12 @@ def process_fluorescent_batch(
     radial_threshold_ratio: float | None = None,
     large_area_factor: float | None = None,
     plot: bool = True,
-) -> Iterator[str | List[Result]]:
+    io_mode: str = "imread",
+    fast_jpeg: bool = False,
+    output_csv: str | None = None,
+    jobs: int | None = None,
+    emit: Callable[[str], None] = print,
+) -> List[Result]:
     """Process a batch of paired brightfield/fluorescent images.
 
     Parameters
@@ -65,78 +206,214 @@ def process_fluorescent_batch(
     large_area_factor:
         Factor relative to median seed area used to discard very large regions.
     plot:
-        If ``True`` show intermediate processing plots.
+        If ``True`` show intermediate processing plots. Samples are then
+        processed one at a time; otherwise they are distributed across a
+        process pool of ``jobs`` workers.
+    io_mode:
+        How images are read from disk, one of ``utils.IO_MODES``.
+    fast_jpeg:
+        Decode JPEG images with libjpeg-turbo if the optional ``PyTurboJPEG``
+        package is installed.
+    output_csv:
+        Optional CSV path to which each sample's result is appended as soon as
+        it is ready, so partial results survive an interrupted batch.
+    jobs:
+        Number of worker processes. Defaults to the number of CPUs; ``1``
+        processes the batch serially.
+    emit:
+        Callback receiving each status message. Defaults to ``print``.
 
-    Yields
-    ------
-    str or List[Result]
-        Status messages during processing followed by the full list of results
-        once the batch is finished.
+    Returns
+    -------
+    List[Result]
+        The results of every sample in the batch.
     """
-    bf_suffix = bf_suffix or DEFAULT_BRIGHTFIELD_SUFFIX
-    fl_suffix = fl_suffix or DEFAULT_FLUORESCENT_SUFFIX
+    _BF = DEFAULT_BRIGHTFIELD_SUFFIX
+    _FL = DEFAULT_FLUORESCENT_SUFFIX
+    bf_suffix = bf_suffix or _BF
+    fl_suffix = fl_suffix or _FL
+
+    params = FluorescentBatchParams(
+        bf_thresh=bf_thresh,
+        fl_thresh=fl_thresh,
+        radial_thresh=radial_thresh,
+        batch_output_dir=batch_output_dir,
+        bf_suffix=bf_suffix,
+        fl_suffix=fl_suffix,
+        radial_threshold_ratio=radial_threshold_ratio,
+        large_area_factor=large_area_factor,
+        plot=plot,
+        io_mode=io_mode,
+        fast_jpeg=fast_jpeg,
+    )
+
+    names = sorted(sample_to_files)
+    n = len(names)
+
+    if jobs is None:
+        jobs = os.cpu_count() or 1
+    elif jobs < 1:
+        raise ValueError(f"jobs must be a positive integer, got {jobs}")
 
     results = []
-    for i, sample_name in enumerate(sorted(sample_to_files.keys())):
-        yield f"Processing sample {sample_name} ({i+1} of {len(sample_to_files.keys())}):"
-        result = Result(sample_name)
-        result.radial_threshold_ratio = radial_threshold_ratio
-        for file_obj in sample_to_files[sample_name]:
-            file_path = file_obj["file_path"]
-            filename = file_obj["file_name"]
-            img_type = file_obj["img_type"]
-
-            image = cv2.imread(file_path)
-            if img_type == bf_suffix:
-                yield f"\t{bf_suffix} (brightfield) image: {filename}"
-                img_type_name = DEFAULT_BRIGHTFIELD_SUFFIX
-                process_seed_result = process_seed_image(
-                    image=image,
-                    img_type=img_type_name,
-                    sample_name=sample_name,
-                    initial_brightness_thresh=bf_thresh,
-                    radial_threshold=radial_thresh,
-                    radial_threshold_ratio=radial_threshold_ratio,
-                    image_L=None,
-                    large_area_factor=large_area_factor,
-                    output_dir=batch_output_dir,
-                    plot=plot,
-                )
-                result.total_seeds = process_seed_result.num_seeds
-                result.bf_thresh = process_seed_result.brightness_threshold
-                result.radial_threshold = process_seed_result.radial_threshold
-            elif img_type == fl_suffix:
-                yield f"\t{fl_suffix} (fluorescent) image: {filename}"
-                img_type_name = DEFAULT_FLUORESCENT_SUFFIX
-                process_seed_result = process_seed_image(
-                    image=image,
-                    img_type=img_type_name,
-                    sample_name=sample_name,
-                    initial_brightness_thresh=fl_thresh,
-                    radial_threshold=radial_thresh,
-                    image_L=None,
-                    radial_threshold_ratio=radial_threshold_ratio,
-                    large_area_factor=large_area_factor,
-                    output_dir=batch_output_dir,
-                    plot=plot,
+    # Plotting goes through matplotlib, which is not safe to use from forked
+    # workers, so interactive runs are always processed serially.
+    if plot or n < 2 or jobs < 2:
+        # Decode the next images in the background while the current one is
+        # being segmented. Closing the prefetcher stops its reader thread
+        # even when a sample fails halfway through the batch.
+        with closing(
+            prefetch_iter(
+                (
+                    file_obj
+                    for sample_name in names
+                    for file_obj in sample_to_files[sample_name]
+                ),
+                io_mode=io_mode,
+                fast_jpeg=fast_jpeg,
+            )
+        ) as prefetcher:
+            for i, sample_name in enumerate(names):
+                emit(f"Processing sample {sample_name} ({i+1} of {n}):")
+                result, messages = _process_one_sample(
+                    sample_name, sample_to_files[sample_name], params, prefetcher
                 )
-                result.marker_seeds = process_seed_result.num_seeds
-                result.marker_thresh = process_seed_result.brightness_threshold
-                result.radial_threshold = process_seed_result.radial_threshold
-            else:
-                yield f"\tUnknown image type for {filename}"
+                for message in messages:
+                    emit(message)
+                results.append(result)
+                if output_csv:
+                    store_results_append(result, output_csv)
+    else:
+        # Each worker runs single-threaded native code (see ``_init_worker``),
+        # otherwise OpenCV and BLAS thread pools in every process
+        # oversubscribe the CPUs
+        with ProcessPoolExecutor(
+            max_workers=min(jobs, n), initializer=_init_worker
+        ) as executor:
+            futures = {
+                executor.submit(
+                    _process_one_sample,
+                    sample_name,
+                    sample_to_files[sample_name],
+                    params,
+                ): sample_name
+                for sample_name in names
+            }
+            recorded = set()
+            try:
+                for i, future in enumerate(as_completed(futures)):
+                    sample_name = futures[future]
+                    result, messages = future.result()
+                    recorded.add(future)
+                    emit(f"Finished sample {sample_name} ({i+1} of {n}):")
+                    for message in messages:
+                        emit(message)
+                    results.append(result)
+                    if output_csv:
+                        store_results_append(result, output_csv)
+            except BaseException:
+                # Fail fast: drop the samples that have not started yet instead
+                # of letting the executor run them all before re-raising, but
+                # keep the samples that did complete
+                for future in futures:
+                    future.cancel()
+                executor.shutdown(wait=True)
+                for future, sample_name in futures.items():
+                    if (
+                        future in recorded
+                        or future.cancelled()
+                        or future.exception() is not None
+                    ):
+                        continue
+                    result, messages = future.result()
+                    emit(f"Finished sample {sample_name}:")
+                    for message in messages:
+                        emit(message)
+                    results.append(result)
+                    if output_csv:
+                        store_results_append(result, output_csv)
+                raise
+        # Keep the results in sample order regardless of completion order
+        results.sort(key=lambda result: result.prefix)
+
+    return results
+
+
+def _stream_batch(
+    run_batch: Callable[..., List[Result]], **kwargs: Any
+) -> Iterator[str | List[Result]]:
+    """Run ``run_batch`` in a background thread and yield its messages live.
 
-        if not result.total_seeds:
-            yield f"\tCouldn't find {bf_suffix} (brightfield) image for {sample_name}. Remember that image should be named <prefix_id>_{bf_suffix}.<img_extension>. Example: img1_{bf_suffix}.tif"
-        if not result.marker_seeds:
-            yield f"\tCouldn't find {fl_suffix} (fluorescent) image for {sample_name}. Remember that image should be named <prefix_id>_{fl_suffix}.<img_extension>. Example: img1_{fl_suffix}.tif"
+    Each status message is yielded as soon as ``run_batch`` emits it, followed
+    by the list of results. An exception raised by the batch is re-raised once
+    the messages emitted before it have been yielded.
+    """
+    q: queue.Queue = queue.Queue()
+    sentinel = object()
+    outcome: Dict[str, Any] = {}
 
-        results.append(result)
+    def target() -> None:
+        try:
+            outcome["results"] = run_batch(emit=q.put, **kwargs)
+        except BaseException as e:
+            outcome["error"] = e
+        finally:
+            q.put(sentinel)
+
+    thread = threading.Thread(target=target, daemon=True)
+    thread.start()
+    while True:
+        message = q.get()
+        if message is sentinel:
+            break
+        yield message
+    thread.join()
+    if "error" in outcome:
+        raise outcome["error"]
+    yield outcome["results"]
 
-    yield results
 
+def process_fluorescent_batch(
+    sample_to_files: Dict[str, List[Dict[str, str]]],
+    bf_thresh: int | None,
+    fl_thresh: int | None,
+    radial_thresh: float | None,
+    batch_output_dir: str | None,
+    bf_suffix: str | None = None,
+    fl_suffix: str | None = None,
+    radial_threshold_ratio: float | None = None,
+    large_area_factor: float | None = None,
+    plot: bool = True,
+    io_mode: str = "imread",
+    fast_jpeg: bool = False,
+    output_csv: str | None = None,
+    jobs: int | None = None,
+) -> Iterator[str | List[Result]]:
+    """Generator interface to :func:`run_fluorescent_batch`.
 
-def process_colorimetric_batch(
+    Takes the same parameters. Yields status messages while the batch is
+    processed, followed by the full list of results.
+    """
+    yield from _stream_batch(
+        run_fluorescent_batch,
+        sample_to_files=sample_to_files,
+        bf_thresh=bf_thresh,
+        fl_thresh=fl_thresh,
+        radial_thresh=radial_thresh,
+        batch_output_dir=batch_output_dir,
+        bf_suffix=bf_suffix,
+        fl_suffix=fl_suffix,
+        radial_threshold_ratio=radial_threshold_ratio,
+        large_area_factor=large_area_factor,
+        plot=plot,
+        io_mode=io_mode,
+        fast_jpeg=fast_jpeg,
+        output_csv=output_csv,
+        jobs=jobs,
+    )
+
+
+def run_colorimetric_batch(
     sample_to_file: Dict[str, List[Dict[str, str]]],
     bf_thresh: int | None,
     radial_thresh: float | None,
@@ -144,7 +421,9 @@ def process_colorimetric_batch(
     radial_threshold_ratio: float | None = None,
     large_area_factor: float | None = None,
     plot: bool = True,
-) -> Iterator[str | List[Result]]:
+    output_csv: str | None = None,
+    emit: Callable[[str], None] = print,
+) -> List[Result]:
     """Process a batch of single RGB images.
 
     Parameters
@@ -167,16 +446,24 @@ def process_colorimetric_batch(
         Factor relative to median seed area used to remove large clumps.
     plot:
         If ``True`` display intermediate plots for each image.
+    output_csv:
+        Optional CSV path to which each sample's result is appended as soon as
+        it is ready, so partial results survive an interrupted batch.
+    emit:
+        Callback receiving each informational message. Defaults to ``print``.
 
-    Yields
-    ------
-    str or List[Result]
-        Informational messages followed by the final results list.
+    Returns
+    -------
+    List[Result]
+        The results of every sample in the batch.
     """
 
+    names = sorted(sample_to_file)
+    n = len(names)
+
     results = []
-    for i, sample_name in enumerate(sorted(sample_to_file.keys())):
-        yield f"Processing sample {sample_name} ({i+1} of {len(sample_to_file)}):"
+    for i, sample_name in enumerate(names):
+        emit(f"Processing sample {sample_name} ({i+1} of {n}):")
         assert len(sample_to_file[sample_name]), "Sample should have only one image"
         file_path = sample_to_file[sample_name][0]["file_path"]
         all_seeds_process_result, colored_seeds_process_result = (
@@ -199,21 +486,51 @@ def process_colorimetric_batch(
         result.radial_threshold = all_seeds_process_result.radial_threshold
         result.radial_threshold_ratio = radial_threshold_ratio
         results.append(result)
+        if output_csv:
+            store_results_append(result, output_csv)
 
         if not result.total_seeds:
-            yield f"\tDid not find any seeds for {sample_name}."
+            emit(f"\tDid not find any seeds for {sample_name}.")
 
         if not result.marker_seeds:
-            yield f"\tDid not find any marker seeds for {sample_name}. Make sure that the marker seeds are RED and that the non-marker seeds are YELLOW-ish. Other colors are not supported yet."
+            emit(f"\tDid not find any marker seeds for {sample_name}. Make sure that the marker seeds are RED and that the non-marker seeds are YELLOW-ish. Other colors are not supported yet.")
 
         if result.marker_seeds and result.total_seeds:
-            yield f"\tSuccessfully processed {sample_name}"
+            emit(f"\tSuccessfully processed {sample_name}")
         else:
-            yield f"\tAdjust parameters to improve results for {sample_name}. See instructions for guidelines on how to ideally set them."
+            emit(f"\tAdjust parameters to improve results for {sample_name}. See instructions for guidelines on how to ideally set them.")
+
+        emit(f"\tResults for {sample_name}: {results[-1]}")
 
-        yield f"\tResults for {sample_name}: {results[-1]}"
+    return results
 
-    yield results
+
+def process_colorimetric_batch(
+    sample_to_file: Dict[str, List[Dict[str, str]]],
+    bf_thresh: int | None,
+    radial_thresh: float | None,
+    batch_output_dir: str | None,
+    radial_threshold_ratio: float | None = None,
+    large_area_factor: float | None = None,
+    plot: bool = True,
+    output_csv: str | None = None,
+) -> Iterator[str | List[Result]]:
+    """Generator interface to :func:`run_colorimetric_batch`.
+
+    Takes the same parameters. Yields informational messages while the batch
+    is processed, followed by the final results list.
+    """
+    yield from _stream_batch(
+        run_colorimetric_batch,
+        sample_to_file=sample_to_file,
+        bf_thresh=bf_thresh,
+        radial_thresh=radial_thresh,
+        batch_output_dir=batch_output_dir,
+        radial_threshold_ratio=radial_threshold_ratio,
+        large_area_factor=large_area_factor,
+        plot=plot,
+        output_csv=output_csv,
+    )
 
 
 def print_welcome_msg() -> None:
@@ -226,6 +543,81 @@ def print_welcome_msg() -> None:
     print()
 
 
+def _pair_int(value: str) -> Tuple[int, int]:
+    """Parse ``"<brightfield_thresh>,<fluorescent_thresh>"`` for ``argparse``."""
+    try:
+        bf_thresh, fl_thresh = value.split(",")
+        return int(bf_thresh), int(fl_thresh)
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            "Invalid intensity threshold format. Format is <brightfield_thresh>,<fluorescent_thresh>. Example: 60,60"
+        )
+
+
+def _pair_str(value: str) -> Tuple[str, str]:
+    """Parse ``"<brightfield_suffix>,<fluorescent_suffix>"`` for ``argparse``."""
+    try:
+        bf_suffix, fl_suffix = value.split(",")
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            "Invalid image type suffix format. Format is <brightfield_suffix>,<fluorescent_suffix>. Example: BF,FL"
+        )
+    return bf_suffix, fl_suffix
+
+
+def _positive_int(value: str) -> int:
+    """Parse a strictly positive integer for ``argparse``."""
+    try:
+        number = int(value)
+    except ValueError:
+        number = 0
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"Expected a positive integer, got {value!r}")
+    return number
+
+
+def _is_valid_img_entry(entry: os.DirEntry) -> bool:
+    """Return whether ``entry`` is a regular file with a supported extension."""
+    return entry.name.lower().endswith(VALID_EXTENSIONS_TUPLE) and entry.is_file()
+
+
+def iter_img_files(
+    input_dir: str,
+    bf_suffix: str,
+    fl_suffix: str,
+) -> Iterator[Tuple[str, Dict[str, str]]]:
+    """Lazily yield ``(sample_name, file_descriptor)`` for paired images in ``input_dir``.
+
+    The directory is streamed with ``os.scandir`` so entries are processed as
+    they are read instead of being listed up front.
+    """
+    with os.scandir(input_dir) as it:
+        for entry in it:
+            if not _is_valid_img_entry(entry):
+                continue
+            sample_name, img_type = parse_filename(entry.name, bf_suffix, fl_suffix)
+            yield sample_name, {
+                "file_path": entry.path,
+                "file_name": entry.name,
+                "img_type": img_type,
+            }
+
+
+def iter_single_img_files(input_dir: str) -> Iterator[Tuple[str, Dict[str, str]]]:
+    """Lazily yield ``(sample_name, file_descriptor)`` for RGB images in ``input_dir``.
+
+    The file name (without extension) is used as the sample name.
+    """
+    with os.scandir(input_dir) as it:
+        for entry in it:
+            if not _is_valid_img_entry(entry):
+                continue
+            yield entry.name.rpartition(".")[0], {
+                "file_path": entry.path,
+                "file_name": entry.name,
+            }
+
+
 def collect_img_files(
     input_dir: str,
     bf_suffix: str,
@@ -246,27 +638,14 @@ def collect_img_files(
         Mapping from sample names to their file descriptors and the list of all
         filenames discovered.
     """
-    file_names = [
-        f
-        for f in os.listdir(input_dir)
-        if os.path.isfile(os.path.join(input_dir, f))
-        and os.path.splitext(f)[-1].lower() in VALID_EXTENSIONS
-    ]
-
-    sample_to_files = {}
-    for filename in file_names:
-        sample_name, img_type = parse_filename(filename, bf_suffix, fl_suffix)
-        file_obj = {
-            "file_path": os.path.join(input_dir, filename),
-            "file_name": filename,
-            "img_type": img_type,
-        }
-        if sample_name not in sample_to_files:
-            sample_to_files[sample_name] = [file_obj]
-        else:
-            sample_to_files[sample_name].append(file_obj)
+    file_names = []
+    sample_to_files = defaultdict(list)
+    for sample_name, file_obj in iter_img_files(input_dir, bf_suffix, fl_suffix):
+        file_names.append(file_obj["file_name"])
+        sample_to_files[sample_name].append(file_obj)
 
-    return sample_to_files, file_names
+    # Return a plain dict so lookups of unknown samples still raise KeyError
+    return dict(sample_to_files), file_names
 
 
 def collect_single_img_files(
@@ -279,25 +658,62 @@ def collect_single_img_files(
     Returns a mapping from sample names to a list containing one file descriptor
     as well as the list of discovered filenames.
     """
-    file_names = [
-        f
-        for f in os.listdir(input_dir)
-        if os.path.isfile(os.path.join(input_dir, f))
-        and os.path.splitext(f)[-1].lower() in VALID_EXTENSIONS
-    ]
-
+    file_names = []
     sample_to_file = {}
-    for filename in file_names:
-        sample_name = os.path.splitext(filename)[0]
-        file_obj = {
-            "file_path": os.path.join(input_dir, filename),
-            "file_name": filename,
-        }
+    for sample_name, file_obj in iter_single_img_files(input_dir):
+        file_names.append(file_obj["file_name"])
         sample_to_file[sample_name] = [file_obj]
 
     return sample_to_file, file_names
 
 
+def _fluorescent_mode_args(
+    args: argparse.Namespace,
+) -> Tuple[Tuple[Any, ...], Dict[str, Any]]:
+    """Return the collector arguments and extra batch options for fluorescence mode."""
+    bf_suffix, fl_suffix = args.img_type_suffix
+    _, fl_thresh = args.intensity_thresh
+    return (bf_suffix, fl_suffix), dict(
+        fl_thresh=fl_thresh,
+        bf_suffix=bf_suffix,
+        fl_suffix=fl_suffix,
+        io_mode=args.io_mode,
+        fast_jpeg=args.fast_jpeg,
+        jobs=args.jobs,
+    )
+
+
+def _colorimetric_mode_args(
+    args: argparse.Namespace,
+) -> Tuple[Tuple[Any, ...], Dict[str, Any]]:
+    """Colorimetric mode only takes the options shared by every mode."""
+    return (), {}
+
+
+# Per counting mode: directory collector, batch entrypoint and a builder that
+# returns the mode's extra collector arguments and batch options from the CLI
+# arguments
+MODE_TABLE: Dict[
+    str,
+    Tuple[
+        Callable[..., Any],
+        Callable[..., List[Result]],
+        Callable[[argparse.Namespace], Tuple[Tuple[Any, ...], Dict[str, Any]]],
+    ],
+] = {
+    CountMethod.FLUORESCENCE.value: (
+        collect_img_files,
+        run_fluorescent_batch,
+        _fluorescent_mode_args,
+    ),
+    CountMethod.COLORIMETRIC.value: (
+        collect_single_img_files,
+        run_colorimetric_batch,
+        _colorimetric_mode_args,
+    ),
+}
+
+
 if __name__ == "__main__":
     help_message = "This script takes an image or directory of images and returns the number of seeds in the image(s)."
     parser = argparse.ArgumentParser(
@@ -330,9 +746,9 @@ if __name__ == "__main__":
     parser.add_argument(
         "-t",
         "--intensity_thresh",
-        type=str,
+        type=_pair_int,
         help='Intensity threshold to capture seeds. Format is <brightfield_thresh>,<fluorescent_thresh>. Example: "30,30". Default: None',
-        default=None,
+        default=(None, None),
     )
     parser.add_argument(
         "-r",
@@ -344,7 +760,7 @@ if __name__ == "__main__":
     parser.add_argument(
         "-s",
         "--img_type_suffix",
-        type=str,
+        type=_pair_str,
         help='Image type suffix. Format is <brightfield_suffix>,<fluorescent_suffix>. Example: BF,FL. Default: "%(default)s"',
         default=f"{DEFAULT_BRIGHTFIELD_SUFFIX},{DEFAULT_FLUORESCENT_SUFFIX}",
     )
@@ -367,37 +783,43 @@ if __name__ == "__main__":
         default=None,
         help="Factor to determine the maximum allowed area for a seed (relative to median area). Used to filter out very large objects. Default is None, meaning that the operation won't be performed.",
     )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=_positive_int,
+        default=os.cpu_count() or 1,
+        help="Number of samples processed in parallel (fluorescence mode, ignored with --plot). OpenCV uses this many threads when processing serially. Default: number of CPUs",
+    )
+    parser.add_argument(
+        "--fast_jpeg",
+        action="store_true",
+        default=False,
+        help="Decode JPEG images with libjpeg-turbo (fluorescence mode). Requires the optional PyTurboJPEG package, otherwise OpenCV is used.",
+    )
+    parser.add_argument(
+        "--io_mode",
+        type=str,
+        choices=list(IO_MODES),
+        default="imread",
+        help='How images are loaded (fluorescence mode). "imread" lets OpenCV read each file, "buffer" reads files concurrently and decodes them from memory. Which is faster depends on the storage. Default: "%(default)s"',
+    )
 
     args = parser.parse_args()
 
     os.makedirs(args.output, exist_ok=True)
 
-    if args.intensity_thresh is not None:
-        try:
-            bf_thresh, fl_thresh = [int(x) for x in args.intensity_thresh.split(",")]
-        except:
-            raise Exception(
-                "Invalid intensity threshold format. Format is <brightfield_thresh>,<fluorescent_thresh>. Example: 60,60"
-            )
-    else:
-        bf_thresh, fl_thresh = None, None
+    bf_thresh, _ = args.intensity_thresh
 
-    if args.mode != CountMethod.COLORIMETRIC.value:
-        try:
-            bf_suffix, fl_suffix = args.img_type_suffix.split(",")
-        except Exception:
-            raise Exception(
-                "Invalid image type suffix format. Format is <brightfield_suffix>,<fluorescent_suffix>. Example: BF,FL"
-            )
-    else:
-        bf_suffix, fl_suffix = None, None
+    collect, run_batch, build_mode_args = MODE_TABLE[args.mode]
+    collect_args, mode_kwargs = build_mode_args(args)
 
     print_welcome_msg()
 
-    if args.mode == CountMethod.FLUORESCENCE.value:
-        sample_to_files, file_names = collect_img_files(args.dir, bf_suffix, fl_suffix)
-    else:
-        sample_to_files, file_names = collect_single_img_files(args.dir)
+    if args.fast_jpeg:
+        # Report once here rather than from every worker process
+        get_turbo_jpeg(warn=True)
+
+    sample_to_files, file_names = collect(args.dir, *collect_args)
     print(
         f"Found {len(sample_to_files.keys())} unique samples in {len(file_names)} files"
     )
@@ -405,39 +827,31 @@ if __name__ == "__main__":
     # Determine whether to store intermediate images
     img_output_dir = None if args.nostore else args.output
 
-    # Process images
-    results = []
-    if args.mode == CountMethod.FLUORESCENCE.value:
-        iterator = process_fluorescent_batch(
-            sample_to_files=sample_to_files,
-            bf_thresh=bf_thresh,
-            fl_thresh=fl_thresh,
-            radial_thresh=args.radial_thresh,
-            batch_output_dir=img_output_dir,
-            bf_suffix=bf_suffix,
-            fl_suffix=fl_suffix,
-            radial_threshold_ratio=args.radial_threshold_ratio,
-            large_area_factor=args.large_area_factor,
-            plot=args.plot,
-        )
-    else:
-        iterator = process_colorimetric_batch(
-            sample_to_file=sample_to_files,
-            bf_thresh=bf_thresh,
-            radial_thresh=args.radial_thresh,
-            batch_output_dir=img_output_dir,
-            radial_threshold_ratio=args.radial_threshold_ratio,
-            large_area_factor=args.large_area_factor,
-            plot=args.plot,
-        )
+    # Results are checkpointed to this file while the batch runs
+    batch_id = datetime.now().strftime("%Y%m%d_%H%M%S")
+    partial_csv = os.path.join(args.output, f"results_{batch_id}.partial.csv")
+
+    # Parallel runs limit OpenCV to one thread per worker; serial runs let
+    # OpenCV itself use the requested number of threads
+    cv2.setNumThreads(args.jobs)
+
+    batch_kwargs = dict(
+        bf_thresh=bf_thresh,
+        radial_thresh=args.radial_thresh,
+        batch_output_dir=img_output_dir,
+        radial_threshold_ratio=args.radial_threshold_ratio,
+        large_area_factor=args.large_area_factor,
+        plot=args.plot,
+        output_csv=partial_csv,
+        **mode_kwargs,
+    )
 
-    for message in iterator:
-        if isinstance(message, str):
-            print(message)
-        else:
-            results = message
+    # Process images
+    results = run_batch(sample_to_files, **batch_kwargs)
 
     # Results CSV is always stored in the output directory
-    store_results(results, args.output)
+    store_results(results, args.output, batch_id=batch_id)
+    if os.path.exists(partial_csv):
+        os.remove(partial_csv)
 
     print("Thanks for your visit!")
@@ -2,10 +2,15 @@ from __future__ import annotations
 
 import math
 import os
+import queue
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from enum import Enum
 from datetime import datetime
-from typing import Any
+from typing import Any, Iterable, Iterator
 
+import cv2
 import matplotlib.pyplot as plt
 import numpy as np
 from dataclasses import dataclass, field
@@ -13,7 +18,29 @@ from scipy.stats import chisquare
 
 from config import TARGET_RATIO
 
+try:
+    # Optional: faster SIMD JPEG decoding, see ``read_image(fast_jpeg=True)``
+    import turbojpeg
+except ImportError:
+    turbojpeg = None
+
 VALID_EXTENSIONS: list[str] = [".tif", ".tiff", ".png", ".jpg", ".jpeg"]
+VALID_EXTENSIONS_SET: frozenset[str] = frozenset(VALID_EXTENSIONS)
+# For ``str.endswith``, which accepts a tuple of suffixes
+VALID_EXTENSIONS_TUPLE: tuple[str, ...] = tuple(
+    e if e.startswith(".") else "." + e for e in VALID_EXTENSIONS
+)
+
+# How images are read from disk. "imread" lets OpenCV read and decode the file;
+# "buffer" reads the raw bytes first and decodes them with ``cv2.imdecode``,
+# which allows several files to be read concurrently. Which one is faster
+# depends on the storage, so benchmark both on the target machine.
+IO_MODES: tuple[str, ...] = ("imread", "buffer")
+BUFFER_READ_WORKERS = 4
+
+JPEG_EXTENSIONS: frozenset[str] = frozenset([".jpg", ".jpeg"])
+_turbo_jpeg: Any = None
+_turbo_jpeg_error: str | None = None
 
 
 class CountMethod(Enum):
@@ -23,6 +50,156 @@ class CountMethod(Enum):
     COLORIMETRIC = "colorimetric"
 
 
+def get_turbo_jpeg(warn: bool = False) -> Any:
+    """Return a shared ``TurboJPEG`` decoder, or ``None`` if it is unavailable.
+
+    Requires the optional ``PyTurboJPEG`` package and the libjpeg-turbo library.
+    With ``warn`` a message explaining why the decoder is unavailable is printed.
+    """
+    global _turbo_jpeg, _turbo_jpeg_error
+    if _turbo_jpeg is None:
+        if turbojpeg is None:
+            _turbo_jpeg_error = "PyTurboJPEG is not installed"
+            _turbo_jpeg = False
+        else:
+            try:
+                _turbo_jpeg = turbojpeg.TurboJPEG()
+            except (OSError, RuntimeError) as e:
+                _turbo_jpeg_error = f"Could not load libjpeg-turbo: {e}"
+                _turbo_jpeg = False
+    if warn and not _turbo_jpeg:
+        print(f"{_turbo_jpeg_error}, JPEG images will be decoded with OpenCV")
+    return _turbo_jpeg or None
+
+
+def _decode_image(
+    file_path: str, io_mode: str, fast_jpeg: bool
+) -> np.ndarray | None:
+    tj = get_turbo_jpeg() if fast_jpeg else None
+    is_jpeg = os.path.splitext(file_path)[-1].lower() in JPEG_EXTENSIONS
+    if io_mode == "buffer" or (tj is not None and is_jpeg):
+        with open(file_path, "rb") as f:
+            buf = f.read()
+        if tj is not None and is_jpeg:
+            try:
+                return tj.decode(buf, pixel_format=turbojpeg.TJPF_BGR)
+            except OSError:
+                # Fall back to OpenCV for JPEGs libjpeg-turbo rejects
+                pass
+        return cv2.imdecode(np.frombuffer(buf, np.uint8), cv2.IMREAD_COLOR)
+    return cv2.imread(file_path, cv2.IMREAD_COLOR)
+
+
+def read_image(
+    file_path: str,
+    io_mode: str = "imread",
+    fast_jpeg: bool = False,
+) -> np.ndarray | None:
+    """Read ``file_path`` as a BGR image.
+
+    ``io_mode`` is one of ``IO_MODES``. With ``fast_jpeg`` JPEG files are
+    decoded with libjpeg-turbo when it is installed (see
+    :func:`get_turbo_jpeg`).
+    """
+    if io_mode not in IO_MODES:
+        raise ValueError(f"Invalid io_mode: {io_mode}. Valid modes are: {IO_MODES}")
+
+    return _decode_image(file_path, io_mode, fast_jpeg)
+
+
+def prefetch_iter(
+    file_descriptors: Iterable[dict[str, str]],
+    maxsize: int = 4,
+    io_mode: str = "imread",
+    fast_jpeg: bool = False,
+) -> Iterator[tuple[dict[str, str], np.ndarray | None]]:
+    """Yield ``(file_descriptor, image)`` pairs decoded by a background thread.
+
+    Up to ``maxsize`` images are read ahead of the consumer, so disk access and
+    decoding overlap with the processing of the current image. In ``"buffer"``
+    mode the files are additionally read by a small thread pool. Each
+    descriptor must contain ``file_path``. See :func:`read_image` for
+    ``io_mode`` and ``fast_jpeg``.
+
+    Callers that may stop before exhausting the iterator should ``close()`` it
+    (e.g. with ``contextlib.closing``) so the reader thread exits right away.
+    """
+    q: queue.Queue = queue.Queue(maxsize=maxsize)
+    sentinel = object()
+    stop = threading.Event()
+    errors: list[BaseException] = []
+
+    def read(file_obj: dict[str, str]) -> np.ndarray | None:
+        return read_image(file_obj["file_path"], io_mode, fast_jpeg)
+
+    def put(item: Any) -> bool:
+        # Block until there is room in the queue, unless the consumer is gone.
+        # Returns whether the item was queued.
+        while not stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def reader() -> None:
+        try:
+            if io_mode == "buffer":
+                # Keep at most ``maxsize`` reads in flight, in input order
+                with ThreadPoolExecutor(max_workers=BUFFER_READ_WORKERS) as pool:
+                    pending: deque = deque()
+                    try:
+                        for file_obj in file_descriptors:
+                            if stop.is_set():
+                                return
+                            pending.append((file_obj, pool.submit(read, file_obj)))
+                            if len(pending) >= maxsize:
+                                done_obj, future = pending.popleft()
+                                if not put((done_obj, future.result())):
+                                    return
+                        while pending:
+                            done_obj, future = pending.popleft()
+                            if not put((done_obj, future.result())):
+                                return
+                    finally:
+                        for _, future in pending:
+                            future.cancel()
+            else:
+                for file_obj in file_descriptors:
+                    if stop.is_set() or not put((file_obj, read(file_obj))):
+                        return
+        except BaseException as e:
+            errors.append(e)
+        finally:
+            put(sentinel)
+
+    def drain() -> None:
+        while True:
+            try:
+                q.get_nowait()
+            except queue.Empty:
+                return
+
+    thread = threading.Thread(target=reader, daemon=True)
+    thread.start()
+    try:
+        while True:
+            item = q.get()
+            if item is sentinel:
+                break
+            yield item
+    finally:
+        # Runs when the consumer stops early too (``close()`` or garbage
+        # collection): stop the reader and release the images it decoded
+        stop.set()
+        drain()
+        thread.join()
+        drain()
+    if errors:
+        raise errors[0]
+
+
 def plot_full(img: np.ndarray, title: str = "", cmap: str = "jet") -> None:
     plt.figure(figsize=(10, 10))
     plt.imshow(img, cmap)
@@ -151,41 +328,51 @@ def compute_chi2(result: Result, expected_ratio: float) -> tuple[float, float]:
     return chi2, p
 
 
+RESULTS_CSV_COLUMNS: list[str] = [
+    "sample",
+    "marker_seeds",
+    "non_marker_seeds",
+    "total_seeds",
+    "ratio_fl_total",
+    "chisquare",
+    "pvalue",
+    "bf_intensity_thresh",
+    "marker_intensity_thresh",
+    "radial_threshold",
+    "radial_threshold_ratio",
+]
+
+
+def build_results_row(result: Result) -> list[str | float | int | None]:
+    """Return the CSV row (matching ``RESULTS_CSV_COLUMNS``) for ``result``."""
+    return [
+        result.prefix,
+        result.marker_seeds,
+        result.non_marker_seeds,
+        result.total_seeds,
+        result.ratio_marker_total,
+        result.chisquare,
+        result.pvalue,
+        result.bf_thresh,
+        round_if_not_none(result.marker_thresh, 2),
+        round_if_not_none(result.radial_threshold, 2),
+        round_if_not_none(result.radial_threshold_ratio, 2),
+    ]
+
+
 def build_results_csv(results: list[Result]) -> list[list[str | float | int | None]]:
     """Return CSV rows (including header) representing the batch ``results``."""
     print(f"results: {results}")
-    col_names = [
-        "sample",
-        "marker_seeds",
-        "non_marker_seeds",
-        "total_seeds",
-        "ratio_fl_total",
-        "chisquare",
-        "pvalue",
-        "bf_intensity_thresh",
-        "marker_intensity_thresh",
-        "radial_threshold",
-        "radial_threshold_ratio",
-    ]
-    rows = [col_names]
+    rows = [RESULTS_CSV_COLUMNS]
     for result in results:
-        row = [
-            result.prefix,
-            result.marker_seeds,
-            result.non_marker_seeds,
-            result.total_seeds,
-            result.ratio_marker_total,
-            result.chisquare,
-            result.pvalue,
-            result.bf_thresh,
-            round(result.marker_thresh, 2),
-            round(result.radial_threshold, 2),
-            round(result.radial_threshold_ratio, 2),
-        ]
-        rows.append(row)
+        rows.append(build_results_row(result))
     return rows
 
 
+def format_csv_row(row: list[str | float | int | None]) -> str:
+    return ",".join([f"{r}" for r in row]) + "\n"
+
+
 def round_if_not_none(num: float | int | None, decimals: int = 2) -> float | int | None:
     return round(num, decimals) if num is not None else None
 
@@ -217,14 +404,26 @@ def store_results(
 
     output_path = os.path.join(batch_output_dir, filename)
 
-    
     with open(output_path, "w") as f:
         for row in results_csv:
-            f.write(",".join([f"{r}" for r in row]) + "\n")
+            f.write(format_csv_row(row))
 
     return output_path
 
 
+def store_results_append(result: Result, csv_path: str) -> None:
+    """Append the row for ``result`` to ``csv_path``.
+
+    The header is written first if the file does not exist yet. Used to
+    checkpoint results while a batch is still running.
+    """
+    write_header = not os.path.exists(csv_path)
+    with open(csv_path, "a") as f:
+        if write_header:
+            f.write(format_csv_row(RESULTS_CSV_COLUMNS))
+        f.write(format_csv_row(build_results_row(result)))
+
+
 def parse_filename(filename: str, bf_suffix: str, fl_suffix: str) -> tuple[str, str]:
     """Parse ``filename`` into ``(sample_name, image_type)``."""
 
@@ -246,7 +445,7 @@ def parse_filename(filename: str, bf_suffix: str, fl_suffix: str) -> tuple[str,
         print(e)
         raise Exception(f"Invalid filename: {filename}. {reminder}")
 
-    if "." + extension not in VALID_EXTENSIONS:
+    if "." + extension not in VALID_EXTENSIONS_SET:
         raise Exception(
             f"Invalid extension: {extension}. Valid extensions are: {VALID_EXTENSIONS}. {reminder}"
         )